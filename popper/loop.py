@@ -1821,13 +1821,17 @@ def rule_subsumes(r1, r2):
     # r1 subsumes r2 if r1 is a subset of r2
     h1, b1 = r1
     h2, b2 = r2
+    if len(b1) > len(b2):
+        return False
     if h1 != None and h2 == None:
         return False
     return b1.issubset(b2)
 
 # P1 subsumes P2 if for every rule R2 in P2 there is a rule R1 in P1 such that R1 subsumes R2
 def theory_subsumes(prog1, prog2):
-    return all(any(rule_subsumes(r1, r2) for r1 in prog1) for r2 in prog2)
+    # a rule with a larger body can never subsume a smaller one, so skip
+    # the subset test for such pairs
+    return all(any(rule_subsumes(r1, r2) for r1 in prog1 if len(r1[1]) <= len(r2[1])) for r2 in prog2)
 
 def seen_more_general_unsat(prog, unsat):
     return any(theory_subsumes(seen, prog) for seen in unsat)
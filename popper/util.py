@@ -1,25 +1,38 @@
 from functools import cache
-import clingo
-import clingo.script
-import signal
-import argparse
 import os
-import logging
+import signal
+import threading
 from itertools import permutations, chain, combinations
 from collections import defaultdict
 from typing import NamedTuple
 from time import perf_counter
-from contextlib import contextmanager
 from math import comb
-import threading
+
+cached_comb = cache(comb)
 
 
 class Literal(NamedTuple):
     predicate: str
     arguments: tuple
 
+def _ensure_clingo():
+    # clingo is expensive to import, which matters when Popper is launched
+    # once per problem by a batch harness, so defer it until a solver is
+    # actually needed
+    global clingo
+    if 'clingo' not in globals():
+        import clingo
+        import clingo.script
+        clingo.script.enable_python()
+    return clingo
+
+def var_mask(xs):
+    # variables are small ints (< max_vars <= 64) so sets of them fit in one int
+    mask = 0
+    for x in xs:
+        mask |= 1 << x
+    return mask
 
-clingo.script.enable_python()
 
 TIMEOUT=1200
 EVAL_TIMEOUT=0.001
@@ -44,6 +57,7 @@ class Constraint:
     BANISH = 7
 
 def parse_args():
+    import argparse
     parser = argparse.ArgumentParser(description='Popper is an ILP system based on learning from failures')
 
     parser.add_argument('kbpath', help='Path to files to learn from')
@@ -71,37 +85,43 @@ def parse_args():
     return parser.parse_args()
 
 def timeout(settings, func, args=(), kwargs={}, timeout_duration=1):
+    # SIGALRM interrupts the running call, which a thread cannot do, so
+    # prefer it whenever it is usable
+    if hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread():
+        return _signal_timeout(settings, func, args, kwargs, timeout_duration)
+    return _thread_timeout(settings, func, args, kwargs, timeout_duration)
+
+def _signal_timeout(settings, func, args, kwargs, timeout_duration):
     result = None
     class TimeoutError(Exception):
         pass
 
     def handler(signum, frame):
         raise TimeoutError()
-    
-    if not (hasattr(signal, 'SIGALRM') and hasattr(signal, 'alarm')):
-        return _windows_timeout(settings, func, args, kwargs, timeout_duration)
 
     # set the timeout handler
-    signal.signal(signal.SIGALRM, handler)
-    signal.alarm(timeout_duration)
+    old_handler = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, timeout_duration)
     try:
         result = func(*args, **kwargs)
     except TimeoutError as _exc:
         settings.logger.warn(f'TIMEOUT OF {int(settings.timeout)} SECONDS EXCEEDED')
-        return result
     except AttributeError as moo:
         if '_SolveEventHandler' in str(moo):
             settings.logger.warn(f'TIMEOUT OF {int(settings.timeout)} SECONDS EXCEEDED')
-            return result
-        raise moo
+        else:
+            raise moo
     finally:
-        signal.alarm(0)
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
 
     return result
 
-def _windows_timeout(settings, func, args=(), kwargs={}, timeout_duration=1):
+def _thread_timeout(settings, func, args, kwargs, timeout_duration):
     """
-    A replacement for the `timeout` function that works on Windows, since the `signal` module is not fully supported on Windows.
+    A fallback for when SIGALRM is unavailable, i.e. on Windows or off the
+    main thread. The call cannot be interrupted, so on timeout it is left
+    behind on a daemon thread that does not block interpreter shutdown.
     """
     result = None
 
@@ -112,16 +132,13 @@ def _windows_timeout(settings, func, args=(), kwargs={}, timeout_duration=1):
         except Exception as e:
             result = e
 
-    thread = threading.Thread(target=target)
+    thread = threading.Thread(target=target, daemon=True)
     thread.start()
     thread.join(timeout_duration)
 
     if thread.is_alive():
-        # If the thread is still alive after the timeout_duration, it means it timed out
-        thread.join()  # Ensure the thread terminates properly
         settings.logger.warn(f'TIMEOUT OF {int(settings.timeout)} SECONDS EXCEEDED')
-        # raise TimeoutError(f"Execution of {func.__name__} timed out after {timeout_duration} seconds")
-        return result
+        return None
 
     if isinstance(result, Exception):
         # If the function raised an exception, re-raise it here
@@ -135,11 +152,34 @@ def load_kbpath(kbpath):
         return full_filename.replace('\\', '\\\\') if os.name == 'nt' else full_filename
     return fix_path("bk.pl"), fix_path("exs.pl"), fix_path("bias.pl")
 
+class Duration:
+    # hand-rolled context manager: cheaper than a generator-based
+    # @contextmanager when entered tens of thousands of times
+    __slots__ = ('durations', 'operation', 'start')
+
+    def __init__(self, durations, operation):
+        self.durations = durations
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        duration = perf_counter() - self.start
+        d = self.durations[self.operation]
+        d[0] += 1
+        d[1] += duration
+        if duration > d[2]:
+            d[2] = duration
+
 class Stats:
     def __init__(self, info = False, debug = False):
         self.exec_start = perf_counter()
         self.total_programs = 0
-        self.durations = {}
+        # per operation: [called, total, max], updated incrementally so that
+        # summaries do not traverse every timed event
+        self.durations = defaultdict(lambda: [0, 0.0, 0.0])
 
     def total_exec_time(self):
         return perf_counter() - self.exec_start
@@ -159,44 +199,32 @@ class Stats:
 
     def duration_summary(self):
         summary = []
-        stats = sorted(self.durations.items(), key = lambda x: sum(x[1]), reverse=True)
-        for operation, durations in stats:
-            called = len(durations)
-            total = sum(durations)
-            mean = sum(durations)/len(durations)
-            maximum = max(durations)
+        stats = sorted(self.durations.items(), key = lambda x: x[1][1], reverse=True)
+        for operation, (called, total, maximum) in stats:
+            mean = total/called
             summary.append(DurationSummary(operation.title(), called, total, mean, maximum))
         return summary
 
-    @contextmanager
     def duration(self, operation):
-        start = perf_counter()
-        try:
-            yield
-        finally:
-            end = perf_counter()
-            duration = end - start
-
-            if operation not in self.durations:
-                self.durations[operation] = [duration]
-            else:
-                self.durations[operation].append(duration)
+        return Duration(self.durations, operation)
 
 
 # def format_prog2(prog):
     # return '\n'.join(format_rule(order_rule2(rule)) for rule in order_prog(prog))
 
+@cache
 def format_literal(literal):
     pred, args = literal
-    args = ','.join(f'V{i}' for i in args)
+    args = ','.join([f'V{i}' for i in args])
     return f'{pred}({args})'
 
+@cache
 def format_rule(rule):
     head, body = rule
     head_str = ''
     if head:
         head_str = format_literal(head)
-    body_str = ','.join(format_literal(literal) for literal in body)
+    body_str = ','.join([format_literal(literal) for literal in body])
     return f'{head_str}:- {body_str}.'
 
 def calc_prog_size(prog):
@@ -210,13 +238,21 @@ def reduce_prog(prog):
     reduced = {}
     for rule in prog:
         head, body = rule
-        k = head, frozenset(body)
-        reduced[k] = rule
+        # literals are their own canonical key, so a rule body only needs
+        # freezing when it is not already a frozenset
+        if not isinstance(body, frozenset):
+            body = frozenset(body)
+        reduced[(head, body)] = rule
     return reduced.values()
 
+@cache
+def order_prog_key(rule):
+    return (rule_is_recursive(rule), len(rule[1]))
+
 def order_prog(prog):
-    return sorted(list(prog), key=lambda rule: (rule_is_recursive(rule), len(rule[1])))
+    return sorted(prog, key=order_prog_key)
 
+@cache
 def rule_is_recursive(rule):
     head, body = rule
     head_pred, _head_args = head
@@ -234,6 +270,7 @@ def prog_has_invention(prog):
         return False
     return any(rule_is_invented(rule) for rule in prog)
 
+@cache
 def rule_is_invented(rule):
     head, body = rule
     if not head:
@@ -253,7 +290,7 @@ class DurationSummary:
         self.maximum = maximum
 
 def flatten(xs):
-    return [item for sublist in xs for item in sublist]
+    return list(chain.from_iterable(xs))
 
 class Settings:
     def __init__(self, cmd_line=False, info=True, debug=False, show_stats=True, max_literals=MAX_LITERALS, timeout=TIMEOUT, quiet=False, eval_timeout=EVAL_TIMEOUT, max_examples=MAX_EXAMPLES, max_body=None, max_rules=None, max_vars=None, functional_test=False, kbpath=False, ex_file=False, bk_file=False, bias_file=False, showcons=False, no_bias=False, order_space=False, noisy=False, batch_size=BATCH_SIZE, solver='rc2', anytime_solver=None, anytime_timeout=ANYTIME_TIMEOUT):
@@ -290,6 +327,7 @@ class Settings:
                 self.bk_file = bk_file
                 self.bias_file = bias_file
 
+        import logging
         self.logger = logging.getLogger("popper")
 
         if quiet:
@@ -328,7 +366,9 @@ class Settings:
         self.recall = {}
         self.solution = None
         self.best_prog_score = None
+        self._bias_order_cache = {}
 
+        clingo = _ensure_clingo()
         solver = clingo.Control(['-Wnone'])
         with open(self.bias_file) as f:
             solver.add('bias', [], f.read())
@@ -343,20 +383,21 @@ class Settings:
         """)
         solver.ground([('bias', [])])
 
+        # walk the atom table once and bucket by signature, rather than one
+        # by_signature scan per bias flag
+        atoms_by_sig = defaultdict(list)
+        for x in solver.symbolic_atoms:
+            symbol = x.symbol
+            atoms_by_sig[(symbol.name, len(symbol.arguments))].append(symbol)
+
         # determine whether recursion enabled
-        self.recursion_enabled = False
-        for x in solver.symbolic_atoms.by_signature('enable_recursion', arity=0):
-            self.recursion_enabled = True
+        self.recursion_enabled = ('enable_recursion', 0) in atoms_by_sig
 
         # determine whether pi enabled
-        self.pi_enabled = False
-        for x in solver.symbolic_atoms.by_signature('enable_pi', arity=0):
-            self.pi_enabled = True
+        self.pi_enabled = ('enable_pi', 0) in atoms_by_sig
 
         # determine whether non_datalog flag is enabled
-        self.non_datalog_flag = False
-        for x in solver.symbolic_atoms.by_signature('non_datalog', arity=0):
-            self.non_datalog_flag = True
+        self.non_datalog_flag = ('non_datalog', 0) in atoms_by_sig
 
 
 
@@ -364,10 +405,10 @@ class Settings:
         # if not self.pi_enabled:
         self.directions = directions = defaultdict(dict)
         self.has_directions = False
-        for x in solver.symbolic_atoms.by_signature('direction', arity=2):
+        for symbol in atoms_by_sig[('direction', 2)]:
             self.has_directions = True
-            pred = x.symbol.arguments[0].name
-            for i, y in enumerate(x.symbol.arguments[1].arguments):
+            pred = symbol.arguments[0].name
+            for i, y in enumerate(symbol.arguments[1].arguments):
                 y = y.name
                 if y == 'in':
                     arg_dir = '+'
@@ -377,29 +418,29 @@ class Settings:
 
 
         self.max_arity = 0
-        for x in solver.symbolic_atoms.by_signature('head_pred', arity=2):
-            self.max_arity = max(self.max_arity, x.symbol.arguments[1].number)
-            head_pred = x.symbol.arguments[0].name
-            head_arity = x.symbol.arguments[1].number
+        for symbol in atoms_by_sig[('head_pred', 2)]:
+            self.max_arity = max(self.max_arity, symbol.arguments[1].number)
+            head_pred = symbol.arguments[0].name
+            head_arity = symbol.arguments[1].number
             head_args = tuple(range(head_arity))
             self.head_literal = Literal(head_pred, head_args)
 
         if self.max_body is None:
-            for x in solver.symbolic_atoms.by_signature('max_body', arity=1):
-                self.max_body = x.symbol.arguments[0].number
+            for symbol in atoms_by_sig[('max_body', 1)]:
+                self.max_body = symbol.arguments[0].number
 
         if self.max_body is None:
             self.max_body = MAX_BODY
 
         if self.max_vars is None:
-            for x in solver.symbolic_atoms.by_signature('max_vars', arity=1):
-                self.max_vars = x.symbol.arguments[0].number
+            for symbol in atoms_by_sig[('max_vars', 1)]:
+                self.max_vars = symbol.arguments[0].number
         if self.max_vars is None:
             self.max_vars = MAX_VARS
 
         if self.max_rules is None:
-            for x in solver.symbolic_atoms.by_signature('max_clauses', arity=1):
-                self.max_rules = x.symbol.arguments[0].number
+            for symbol in atoms_by_sig[('max_clauses', 1)]:
+                self.max_rules = symbol.arguments[0].number
         if self.max_rules is None:
             if self.pi_enabled or self.recursion_enabled:
                 self.max_rules = MAX_RULES
@@ -408,9 +449,9 @@ class Settings:
 
         # find all body preds
         self.body_preds = set()
-        for x in solver.symbolic_atoms.by_signature('body_pred', arity=2):
-            pred = x.symbol.arguments[0].name
-            arity = x.symbol.arguments[1].number
+        for symbol in atoms_by_sig[('body_pred', 2)]:
+            pred = symbol.arguments[0].name
+            arity = symbol.arguments[1].number
             self.body_preds.add((pred, arity))
             self.max_arity = max(self.max_arity, arity)
 
@@ -428,14 +469,22 @@ class Settings:
         # print(directions)
 
         self.cached_atom_args = {}
+        args_by_arity = defaultdict(list)
+        # one clingo.Number per variable, reused across all permutations
+        num_cache = tuple(clingo.Number(x) for x in range(self.max_vars))
         for i in range(1, self.max_arity+1):
             for args in permutations(range(0, self.max_vars), i):
-                k = tuple(clingo.Number(x) for x in args)
+                k = tuple(num_cache[x] for x in args)
                 self.cached_atom_args[k] = args
+                args_by_arity[i].append((k, args))
 
         self.cached_literals = {}
         self.literal_inputs = {}
         self.literal_outputs = {}
+        # bitmask versions of the above, used by the hot ordering code
+        self.literal_inputs_mask = {}
+        self.literal_outputs_mask = {}
+        self.literal_args_mask = {}
 
         if self.has_directions:
             head_pred, head_args = self.head_literal
@@ -445,16 +494,22 @@ class Settings:
                 head_outputs = frozenset(arg for i, arg in enumerate(head_args) if directions[head_pred][i] == '-')
                 self.literal_inputs[(head_pred, head_args)] = head_inputs
                 self.literal_outputs[(head_pred, head_args)] = head_outputs
+                self.literal_inputs_mask[(head_pred, head_args)] = var_mask(head_inputs)
+                self.literal_outputs_mask[(head_pred, head_args)] = var_mask(head_outputs)
+                self.literal_args_mask[(head_pred, head_args)] = var_mask(head_args)
 
         for pred, arity in self.body_preds:
-            for k, args in self.cached_atom_args.items():
-                if len(args) != arity:
-                    continue
+            for k, args in args_by_arity[arity]:
                 literal = Literal(pred, args)
                 self.cached_literals[(pred, k)] = literal
+                self.literal_args_mask[(pred, args)] = var_mask(args)
                 if self.has_directions:
-                    self.literal_inputs[(pred, args)] = frozenset(arg for i, arg in enumerate(args) if directions[pred][i] == '+')
-                    self.literal_outputs[(pred, args)] = frozenset(arg for i, arg in enumerate(args) if directions[pred][i] == '-')
+                    literal_inputs = frozenset(arg for i, arg in enumerate(args) if directions[pred][i] == '+')
+                    literal_outputs = frozenset(arg for i, arg in enumerate(args) if directions[pred][i] == '-')
+                    self.literal_inputs[(pred, args)] = literal_inputs
+                    self.literal_outputs[(pred, args)] = literal_outputs
+                    self.literal_inputs_mask[(pred, args)] = var_mask(literal_inputs)
+                    self.literal_outputs_mask[(pred, args)] = var_mask(literal_outputs)
 
         # for k, vs in self.literal_inputs.items():
             # print(k, vs)
@@ -465,9 +520,7 @@ class Settings:
         pred = self.head_literal.predicate
         arity = len(self.head_literal.arguments)
 
-        for k, args in self.cached_atom_args.items():
-            if len(args) != arity:
-                continue
+        for k, args in args_by_arity[arity]:
             literal = Literal(pred, args)
             self.cached_literals[(pred, k)] = literal
 
@@ -477,7 +530,18 @@ class Settings:
             else:
                 self.max_rules = 1
 
-        self.head_types, self.body_types = load_types(self)
+        # read types from the solver grounded above rather than re-parsing
+        # and re-grounding the bias file
+        self.head_types = None
+        self.body_types = {}
+        head_pred = self.head_literal.predicate
+        for symbol in atoms_by_sig[('type', 2)]:
+            pred = symbol.arguments[0].name
+            xs = [y.name for y in symbol.arguments[1].arguments]
+            if pred == head_pred:
+                self.head_types = xs
+            else:
+                self.body_types[pred] = xs
 
 
         if len(self.body_types) > 0 or not self.head_types is None:
@@ -529,60 +593,64 @@ class Settings:
         # print(self.format_prog(order_prog(prog)))
         print('*'*30)
 
+    @cache
     def order_rule(self, rule):
         head, body = rule
 
         if self.datalog:
-            return self.order_rule_datalog(head, frozenset(body))
+            if not isinstance(body, frozenset):
+                body = frozenset(body)
+            return self.order_rule_datalog(head, body)
 
         if not self.has_directions:
             return rule
 
 
         ordered_body = []
-        grounded_variables = set()
+        # grounded variables as a bitmask: one AND per subset test
+        grounded = 0
 
         if head:
             head_pred, head_args = head
-            head_inputs = self.literal_inputs[(head_pred, head_args)]
-            if head_inputs == []:
-                return rule
-            grounded_variables.update(head_inputs)
-
-        body_literals = set(body)
+            grounded |= self.literal_inputs_mask[(head_pred, head_args)]
 
+        if not isinstance(body, tuple):
+            body = tuple(body)
+        # unpicked literals as a bitmask over indices into the body tuple
+        remaining = (1 << len(body)) - 1
 
-        while body_literals:
-            selected_literal = None
-            for literal in body_literals:
+        while remaining:
+            selected_index = None
+            for i, literal in enumerate(body):
+                if not remaining >> i & 1:
+                    continue
                 pred, args = literal
-                literal_outputs = self.literal_outputs[(pred, args)]
 
-                if len(literal_outputs) == len(args):
-                    selected_literal = literal
+                if self.literal_outputs_mask[(pred, args)] == self.literal_args_mask[(pred, args)]:
+                    # all arguments are outputs
+                    selected_index = i
                     break
 
-                literal_inputs = self.literal_inputs[(pred, args)]
-                if not literal_inputs.issubset(grounded_variables):
+                if self.literal_inputs_mask[(pred, args)] & ~grounded:
                     continue
 
                 if head and pred != head.predicate:
                     # find the first ground non-recursive body literal and stop
-                    selected_literal = literal
+                    selected_index = i
                     break
-                elif selected_literal == None:
+                elif selected_index == None:
                     # otherwise use the recursive body literal
-                    selected_literal = literal
+                    selected_index = i
 
-            if selected_literal == None:
-                message = f'{selected_literal} in clause {format_rule(rule)} could not be grounded'
+            if selected_index == None:
+                message = f'clause {format_rule(rule)} could not be grounded'
                 raise ValueError(message)
 
+            remaining &= ~(1 << selected_index)
+            selected_literal = body[selected_index]
             ordered_body.append(selected_literal)
             pred, args = selected_literal
-            selected_literal_outputs = self.literal_outputs[(pred, args)]
-            grounded_variables = grounded_variables.union(selected_literal_outputs)
-            body_literals = body_literals.difference({selected_literal})
+            grounded |= self.literal_outputs_mask[(pred, args)]
 
         return head, tuple(ordered_body)
 
@@ -592,7 +660,7 @@ class Settings:
             pred, args = literal
             key = []
             for x in args:
-                if x in seen_vars:
+                if seen_vars & (1 << x):
                     key.append('1')
                 else:
                     key.append('0')
@@ -606,15 +674,17 @@ class Settings:
 
         # head, body = rule
         ordered_body = []
-        seen_vars = set()
+        # seen variables as a bitmask: one AND per subset test
+        seen_vars = 0
 
         if head:
-            seen_vars.update(head.arguments)
+            seen_vars |= var_mask(head.arguments)
         body_literals = set(body)
+        args_masks = {literal: var_mask(literal.arguments) for literal in body_literals}
         while body_literals:
             selected_literal = None
             for literal in body_literals:
-                if set(literal.arguments).issubset(seen_vars):
+                if not args_masks[literal] & ~seen_vars:
                     selected_literal = literal
                     break
 
@@ -623,8 +693,8 @@ class Settings:
                 selected_literal = xs[0]
 
             ordered_body.append(selected_literal)
-            seen_vars = seen_vars.union(selected_literal.arguments)
-            body_literals = body_literals.difference({selected_literal})
+            seen_vars |= args_masks[selected_literal]
+            body_literals.discard(selected_literal)
 
         return head, tuple(ordered_body)
 
@@ -636,39 +706,17 @@ def non_empty_subset(iterable):
     s = tuple(iterable)
     return chain.from_iterable(combinations(s, r) for r in range(1, len(s)))
 
-def load_types(settings):
-    enc = """
-#defined clause/1.
-#defined clause_var/2.
-#defined var_type/3."""
-    # solver = clingo.Control()
-    solver = clingo.Control(['-Wnone'])
-    with open(settings.bias_file) as f:
-        solver.add('bias', [], f.read())
-    solver.add('bias', [], enc)
-    solver.ground([('bias', [])])
-
-    for x in solver.symbolic_atoms.by_signature('head_pred', arity=2):
-        head_pred = x.symbol.arguments[0].name
-        head_arity = x.symbol.arguments[1].number
-
-    head_types = None
-    body_types = {}
-    for x in solver.symbolic_atoms.by_signature('type', arity=2):
-        pred = x.symbol.arguments[0].name
-        # xs = (str(t) for t in )
-        xs = [y.name for y in x.symbol.arguments[1].arguments]
-        if pred == head_pred:
-            head_types = xs
-        else:
-            body_types[pred] = xs
-
-    return head_types, body_types
-
 def bias_order(settings, max_size):
 
+    # bias_order is pure in these parameters, so reuse the enumeration across calls
+    key = (max_size, settings.no_bias, settings.order_space, settings.max_vars, settings.max_rules, settings.max_body, settings.max_arity, len(settings.body_preds))
+    if key in settings._bias_order_cache:
+        return settings._bias_order_cache[key]
+
     if not (settings.no_bias or settings.order_space):
-        return [(size_literals, settings.max_vars, settings.max_rules, None) for size_literals in range(1, max_size+1)]
+        ret = [(size_literals, settings.max_vars, settings.max_rules, None) for size_literals in range(1, max_size+1)]
+        settings._bias_order_cache[key] = ret
+        return ret
 
     # if settings.search_order is None:
     ret = []
@@ -677,13 +725,15 @@ def bias_order(settings, max_size):
     min_rules = settings.max_rules
     if settings.no_bias:
         min_rules = 1
+    minimum_vars = settings.max_vars
+    if settings.no_bias:
+        minimum_vars = 1
+    # number of possible literals for a given number of variables
+    num_literals = {size_vars: predicates * pow(size_vars, arity) for size_vars in range(minimum_vars, settings.max_vars+1)}
     for size_rules in range(min_rules, settings.max_rules+1):
         max_size = (1 + settings.max_body) * size_rules
         for size_literals in range(1, max_size+1):
             # print(size_literals)
-            minimum_vars = settings.max_vars
-            if settings.no_bias:
-                minimum_vars = 1
             for size_vars in range(minimum_vars, settings.max_vars+1):
                 # FG We should not search for configurations with more variables than the possible variables for the number of litereals considered
                 # There must be at least one variable repeated, otherwise all the literals are disconnected
@@ -692,13 +742,14 @@ def bias_order(settings, max_size):
                 if size_vars > max_possible_vars:
                     break
 
-                hspace = comb(predicates * pow(size_vars, arity), size_literals)
-
                 # AC @ FG: handy code to skip pointless unsat calls
-                if hspace == 0:
+                if size_literals > num_literals[size_vars]:
+                    # hspace would be 0
                     continue
                 if size_rules > 1 and size_literals < 5:
                     continue
+
+                hspace = cached_comb(num_literals[size_vars], size_literals)
                 ret.append((size_literals, size_vars, size_rules, hspace))
 
     if settings.order_space:
@@ -707,6 +758,7 @@ def bias_order(settings, max_size):
     #for x in ret:
     #    print(x)
 
+    settings._bias_order_cache[key] = ret
     settings.search_order = ret
     return settings.search_order
 
@@ -748,23 +800,25 @@ class suppress_stdout_stderr(object):
     exited (at least, I think that is why it lets exceptions through).
 
     '''
+    # Open a pair of null files once and reuse them for every suppression
+    # block, halving the syscalls per use
+    _null_fds = (os.open(os.devnull,os.O_RDWR), os.open(os.devnull,os.O_RDWR))
+
     def __init__(self):
-        # Open a pair of null files
-        self.null_fds =  [os.open(os.devnull,os.O_RDWR) for x in range(2)]
         # Save the actual stdout (1) and stderr (2) file descriptors.
         self.save_fds = [os.dup(1), os.dup(2)]
 
     def __enter__(self):
         # Assign the null pointers to stdout and stderr.
-        os.dup2(self.null_fds[0],1)
-        os.dup2(self.null_fds[1],2)
+        os.dup2(self._null_fds[0],1)
+        os.dup2(self._null_fds[1],2)
 
     def __exit__(self, *_):
         # Re-assign the real stdout/stderr back to (1) and (2)
         os.dup2(self.save_fds[0],1)
         os.dup2(self.save_fds[1],2)
-        # Close all file descriptors
-        for fd in self.null_fds + self.save_fds:
+        # Close the saved file descriptors
+        for fd in self.save_fds:
             os.close(fd)
 
 def rename_variables(rule):
@@ -824,4 +878,4 @@ def remap_variables(rule):
     return head, frozenset(new_body)
 
 def format_prog(prog):
-    return '\n'.join(format_rule(rule) for rule in prog)
\ No newline at end of file
+    return '\n'.join([format_rule(rule) for rule in prog])
\ No newline at end of file